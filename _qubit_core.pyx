@@ -0,0 +1,30 @@
+# cython: language_level=3
+"""Compiled fade-math helpers for Escape the Qubits.
+
+Build in place with:
+
+    python setup.py build_ext --inplace
+
+escape_qubits falls back to its pure-Python (or Numba) path when this
+extension has not been built, so compiling it is optional.
+"""
+
+
+def compute_alphas(list qubits, Py_ssize_t n, long long now, long long lifetime):
+    """Fade alpha (0-255) for the first n pooled qubits; 0 once expired.
+    Timestamps are integer milliseconds from pygame.time.get_ticks()."""
+    cdef Py_ssize_t i
+    cdef long long age
+    cdef long long a
+    cdef list out = [0] * n
+    for i in range(n):
+        age = now - <long long>qubits[i].spawn_time
+        if age >= lifetime:
+            continue
+        a = 255 - (255 * age) // lifetime
+        if a < 0:
+            a = 0
+        elif a > 255:
+            a = 255
+        out[i] = a
+    return out
@@ -1,316 +1,666 @@
-"""
-Escape the Qubits
-Student-friendly Pygame game:
-- Grid-based board (start bottom-left, goal top-right)
-- Qubit creatures randomly pop up in tiles and fade out
-- Avoid qubits and reach the destination within a timer
-"""
-
-import pygame
-import sys
-import random
-import time
-import colorsys
-
-# -------------------- Configuration --------------------
-GRID_COLS = 10
-GRID_ROWS = 10
-TILE_SIZE = 64                 # pixels per tile
-HUD_HEIGHT = 80                 # extra area for timer / text
-SCREEN_WIDTH = GRID_COLS * TILE_SIZE
-SCREEN_HEIGHT = GRID_ROWS * TILE_SIZE + HUD_HEIGHT
-
-FPS = 60
-
-TOTAL_TIME = 45.0               # seconds to reach the goal
-MAX_ACTIVE_QUBITS = 6
-SPAWN_INTERVAL_MIN = 0.4        # seconds between qubit spawns (min)
-SPAWN_INTERVAL_MAX = 1.1        # seconds between qubit spawns (max)
-QUBIT_LIFETIME = 1.2            # how long a qubit stays (seconds)
-
-PLAYER_COLOR = (250, 250, 250)
-DEST_COLOR = (255, 215, 0)
-
-# -------------------------------------------------------
-
-def hsv_to_rgb255(h, s, v):
-    r, g, b = colorsys.hsv_to_rgb(h, s, v)
-    return int(r * 255), int(g * 255), int(b * 255)
-
-
-class Qubit:
-    """A qubit creature that appears on a grid tile for a short time and fades out."""
-    def __init__(self, grid_pos, spawn_time, lifetime=QUBIT_LIFETIME):
-        self.grid_pos = grid_pos         # (col, row)
-        self.spawn_time = spawn_time
-        self.lifetime = lifetime
-
-    def age(self, now):
-        return now - self.spawn_time
-
-    def is_alive(self, now):
-        return self.age(now) < self.lifetime
-
-    def alpha(self, now):
-        """Return 0-255 alpha (fade out as age increases)."""
-        a = self.age(now)
-        frac = max(0.0, min(1.0, a / self.lifetime))
-        # fade in a little then fade out: small ease
-        # quick pop then fade
-        return int(255 * (1.0 - frac))
-
-
-class Game:
-    def __init__(self):
-        pygame.init()
-        pygame.font.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Escape the Qubits")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont(None, 28)
-        self.big_font = pygame.font.SysFont(None, 54)
-
-        # grid positions: player starts bottom-left
-        self.start = (0, GRID_ROWS - 1)
-        self.goal = (GRID_COLS - 1, 0)
-        self.reset()
-
-    def reset(self):
-        self.player = list(self.start)
-        self.qubits = []                 # list of Qubit
-        self.start_time = time.time()
-        self.next_spawn_time = self.start_time + random.uniform(SPAWN_INTERVAL_MIN, SPAWN_INTERVAL_MAX)
-        self.running = True
-        self.win = False
-        self.lose = False
-        self.pause = False
-
-    def spawn_qubit(self, now):
-        """Spawn a qubit on a random tile (can pop on player's tile -> instant lose).
-           We never spawn on the goal tile to avoid unfair blocking."""
-        if len(self.qubits) >= MAX_ACTIVE_QUBITS:
-            return
-        tries = 0
-        while tries < 50:
-            c = random.randrange(GRID_COLS)
-            r = random.randrange(GRID_ROWS)
-            if (c, r) == self.goal:
-                tries += 1
-                continue
-            # allow spawn on player tile to make it challenging
-            candidate = (c, r)
-            # ensure no active qubit already at that tile
-            if any(q.grid_pos == candidate and q.is_alive(now) for q in self.qubits):
-                tries += 1
-                continue
-            self.qubits.append(Qubit(candidate, now))
-            return
-
-    def grid_to_pixel(self, grid_pos):
-        col, row = grid_pos
-        x = col * TILE_SIZE
-        y = row * TILE_SIZE
-        return x, y
-
-    def handle_input(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit(0)
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE or event.key == pygame.K_q:
-                    pygame.quit()
-                    sys.exit(0)
-
-                if self.win or self.lose:
-                    if event.key == pygame.K_r:
-                        self.reset()
-                    continue
-
-                # Movement keys
-                if event.key == pygame.K_LEFT:
-                    self.try_move(-1, 0)
-                elif event.key == pygame.K_RIGHT:
-                    self.try_move(1, 0)
-                elif event.key == pygame.K_UP:
-                    self.try_move(0, -1)
-                elif event.key == pygame.K_DOWN:
-                    self.try_move(0, 1)
-
-    def try_move(self, dx, dy):
-        if not (self.running and not self.pause):
-            return
-        new_c = self.player[0] + dx
-        new_r = self.player[1] + dy
-        if 0 <= new_c < GRID_COLS and 0 <= new_r < GRID_ROWS:
-            self.player = [new_c, new_r]
-            now = time.time()
-            # check collision with any alive qubit at new cell
-            for q in self.qubits:
-                if q.grid_pos == tuple(self.player) and q.is_alive(now):
-                    self.lose = True
-                    self.running = False
-                    return
-            # check if reached goal
-            if tuple(self.player) == self.goal:
-                self.win = True
-                self.running = False
-                return
-
-    def update(self):
-        now = time.time()
-
-        # Spawn qubit if time
-        if now >= self.next_spawn_time and self.running:
-            self.spawn_qubit(now)
-            self.next_spawn_time = now + random.uniform(SPAWN_INTERVAL_MIN, SPAWN_INTERVAL_MAX)
-
-        # Remove dead qubits
-        self.qubits = [q for q in self.qubits if q.is_alive(now)]
-
-        # If a qubit popped exactly on player's tile (spawned this frame), detect
-        for q in self.qubits:
-            if q.grid_pos == tuple(self.player) and q.is_alive(now) and self.running:
-                # immediate lose
-                self.lose = True
-                self.running = False
-                return
-
-        # Timer check
-        elapsed = now - self.start_time
-        time_left = TOTAL_TIME - elapsed
-        if time_left <= 0 and self.running:
-            self.lose = True
-            self.running = False
-
-    def draw_grid(self):
-        # colorful checkerboard using HSV
-        for c in range(GRID_COLS):
-            for r in range(GRID_ROWS):
-                x = c * TILE_SIZE
-                y = r * TILE_SIZE
-                # compute a hue that varies across the board to look colorful
-                hue = ((c / (GRID_COLS - 1) if GRID_COLS > 1 else 0) +
-                       (r / (GRID_ROWS - 1) if GRID_ROWS > 1 else 0)) / 2.5
-                color = hsv_to_rgb255((hue + 0.07) % 1.0, 0.55, 0.95)
-                rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
-                pygame.draw.rect(self.screen, color, rect)
-                # subtle grid line
-                pygame.draw.rect(self.screen, (200, 200, 200), rect, 1)
-
-        # draw goal tile highlight
-        gx, gy = self.grid_to_pixel(self.goal)
-        goal_rect = pygame.Rect(gx, gy, TILE_SIZE, TILE_SIZE)
-        pygame.draw.rect(self.screen, DEST_COLOR, goal_rect)
-        pygame.draw.rect(self.screen, (120, 120, 0), goal_rect, 3)
-        # small star in center
-        cx = gx + TILE_SIZE // 2
-        cy = gy + TILE_SIZE // 2
-        pygame.draw.circle(self.screen, (255, 255, 255), (cx, cy), 8)
-
-    def draw_qubits(self):
-        now = time.time()
-        for q in self.qubits:
-            if not q.is_alive(now):
-                continue
-            x, y = self.grid_to_pixel(q.grid_pos)
-            cx = x + TILE_SIZE // 2
-            cy = y + TILE_SIZE // 2
-            # compute alpha and radius
-            alpha = q.alpha(now)
-            radius = int(TILE_SIZE * 0.36)
-            # pick a color based on grid pos to vary look
-            hue = ((q.grid_pos[0] + q.grid_pos[1]) / (GRID_COLS + GRID_ROWS)) % 1.0
-            color_rgb = hsv_to_rgb255(hue, 0.8, 1.0)
-            # draw with per-surface alpha
-            surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-            # outer glow
-            glow_alpha = min(120, alpha // 2 + 60)
-            pygame.draw.circle(surf, (color_rgb[0], color_rgb[1], color_rgb[2], glow_alpha), (radius, radius), radius)
-            # inner core
-            core_alpha = alpha
-            pygame.draw.circle(surf, (255, 255, 255, core_alpha), (radius, radius), int(radius * 0.55))
-            self.screen.blit(surf, (cx - radius, cy - radius))
-
-    def draw_player(self):
-        x, y = self.grid_to_pixel(tuple(self.player))
-        cx = x + TILE_SIZE // 2
-        cy = y + TILE_SIZE // 2
-        radius = int(TILE_SIZE * 0.36)
-        # player body
-        pygame.draw.circle(self.screen, PLAYER_COLOR, (cx, cy), radius)
-        # little eyes to look cute
-        eye_offset = radius // 3
-        pygame.draw.circle(self.screen, (60, 60, 60), (cx - eye_offset, cy - 6), 5)
-        pygame.draw.circle(self.screen, (60, 60, 60), (cx + eye_offset, cy - 6), 5)
-        # light ring
-        pygame.draw.circle(self.screen, (200, 200, 255), (cx, cy), radius, 3)
-
-    def draw_hud(self):
-        now = time.time()
-        elapsed = now - self.start_time
-        time_left = max(0.0, TOTAL_TIME - elapsed)
-        # Timer text
-        txt = f"Time left: {int(time_left)}s"
-        surf = self.font.render(txt, True, (20, 20, 20))
-        self.screen.blit(surf, (10, SCREEN_HEIGHT - HUD_HEIGHT + 12))
-
-        # Timer bar
-        bar_x = 170
-        bar_y = SCREEN_HEIGHT - HUD_HEIGHT + 18
-        bar_w = SCREEN_WIDTH - bar_x - 20
-        bar_h = 18
-        frac = max(0.0, min(1.0, time_left / TOTAL_TIME))
-        pygame.draw.rect(self.screen, (200, 200, 200), (bar_x, bar_y, bar_w, bar_h))
-        pygame.draw.rect(self.screen, (60, 180, 60), (bar_x, bar_y, int(bar_w * frac), bar_h))
-        pygame.draw.rect(self.screen, (0,0,0), (bar_x, bar_y, bar_w, bar_h), 2)
-
-        # Instructions
-        ins = "Use arrow keys to move. Avoid qubits! Reach the golden tile. R = restart."
-        ins_surf = self.font.render(ins, True, (30, 30, 30))
-        self.screen.blit(ins_surf, (10, SCREEN_HEIGHT - HUD_HEIGHT + 40))
-
-    def draw_end_screen(self):
-        center_x = SCREEN_WIDTH // 2
-        center_y = SCREEN_HEIGHT // 2 - 30
-        if self.win:
-            text = "You Win! 🎉"
-            sub = "Press R to play again"
-            color = (40, 160, 40)
-        else:
-            text = "Game Over 💥"
-            sub = "Press R to try again"
-            color = (200, 40, 40)
-
-        txt_surf = self.big_font.render(text, True, color)
-        rect = txt_surf.get_rect(center=(center_x, center_y))
-        self.screen.blit(txt_surf, rect)
-
-        sub_surf = self.font.render(sub, True, (60, 60, 60))
-        sub_rect = sub_surf.get_rect(center=(center_x, center_y + 60))
-        self.screen.blit(sub_surf, sub_rect)
-
-    def run(self):
-        while True:
-            dt = self.clock.tick(FPS) / 1000.0
-            self.handle_input()
-            if self.running:
-                self.update()
-
-            # Draw
-            self.screen.fill((10, 10, 20))
-            self.draw_grid()
-            self.draw_qubits()
-            self.draw_player()
-            self.draw_hud()
-
-            if not self.running:
-                self.draw_end_screen()
-
-            pygame.display.flip()
-
-
-if __name__ == "__main__":
-    game = Game()
-    game.run()
+"""
+Escape the Qubits
+Student-friendly Pygame game:
+- Grid-based board (start bottom-left, goal top-right)
+- Qubit creatures randomly pop up in tiles and fade out
+- Avoid qubits and reach the destination within a timer
+"""
+
+import pygame
+import sys
+import random
+import colorsys
+
+# Optional GPU-accelerated rendering (pygame's experimental SDL2 Renderer API).
+# The classic software Surface path stays the default; pass --gpu to opt in.
+try:
+    from pygame._sdl2.video import Window, Renderer, Texture
+    HAS_SDL2_VIDEO = True
+except ImportError:
+    HAS_SDL2_VIDEO = False
+
+# Optional numpy: vectorized random-sample pools for the spawn logic.
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Optional Numba-compiled kernel for the per-qubit fade math. Purely an
+# accelerator: the game falls back to the plain-Python loop without it.
+try:
+    from numba import njit
+    HAS_NUMBA = HAS_NUMPY  # the kernel works on numpy buffers
+except ImportError:
+    HAS_NUMBA = False
+
+# Optional Cython-compiled fade helpers (python setup.py build_ext --inplace).
+try:
+    import _qubit_core
+    HAS_QUBIT_CORE = True
+except ImportError:
+    HAS_QUBIT_CORE = False
+
+# -------------------- Configuration --------------------
+GRID_COLS = 10
+GRID_ROWS = 10
+TILE_SIZE = 64                 # pixels per tile
+HUD_HEIGHT = 80                 # extra area for timer / text
+SCREEN_WIDTH = GRID_COLS * TILE_SIZE
+SCREEN_HEIGHT = GRID_ROWS * TILE_SIZE + HUD_HEIGHT
+
+FPS = 60
+
+TOTAL_TIME_MS = 45000           # milliseconds to reach the goal
+MAX_ACTIVE_QUBITS = 6
+SPAWN_INTERVAL_MIN_MS = 400     # milliseconds between qubit spawns (min)
+SPAWN_INTERVAL_MAX_MS = 1100    # milliseconds between qubit spawns (max)
+QUBIT_LIFETIME_MS = 1200        # how long a qubit stays (milliseconds)
+
+PLAYER_COLOR = (250, 250, 250)
+DEST_COLOR = (255, 215, 0)
+
+# -------------------------------------------------------
+
+def hsv_to_rgb255(h, s, v):
+    r, g, b = colorsys.hsv_to_rgb(h, s, v)
+    return int(r * 255), int(g * 255), int(b * 255)
+
+
+def _tile_hue(c, r):
+    # a hue that varies across the board to look colorful
+    return ((c / (GRID_COLS - 1) if GRID_COLS > 1 else 0) +
+            (r / (GRID_ROWS - 1) if GRID_ROWS > 1 else 0)) / 2.5
+
+
+# Color of every tile / qubit, computed once at import so colorsys never
+# runs after startup.
+TILE_COLORS = {(c, r): hsv_to_rgb255((_tile_hue(c, r) + 0.07) % 1.0, 0.55, 0.95)
+               for c in range(GRID_COLS) for r in range(GRID_ROWS)}
+QUBIT_COLORS = {(c, r): hsv_to_rgb255(((c + r) / (GRID_COLS + GRID_ROWS)) % 1.0, 0.8, 1.0)
+                for c in range(GRID_COLS) for r in range(GRID_ROWS)}
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _alpha_kernel(spawn, now, lifetime, out_alpha):
+        """Fade alpha for each spawn time (integer ms); 0 once expired.
+        cache=True persists the compiled code so relaunches skip the JIT cost."""
+        for i in range(spawn.shape[0]):
+            age = now - spawn[i]
+            if age >= lifetime:
+                out_alpha[i] = 0
+            else:
+                a = 255 - (255 * age) // lifetime
+                out_alpha[i] = 0 if a < 0 else (255 if a > 255 else a)
+
+
+class Qubit:
+    """A qubit creature that appears on a grid tile for a short time and fades out."""
+    __slots__ = ('grid_pos', 'spawn_time', 'lifetime')
+
+    def __init__(self, grid_pos, spawn_time, lifetime=QUBIT_LIFETIME_MS):
+        self.grid_pos = grid_pos         # (col, row)
+        self.spawn_time = spawn_time     # pygame.time.get_ticks() ms
+        self.lifetime = lifetime
+
+    def age(self, now):
+        return now - self.spawn_time
+
+    def is_alive(self, now):
+        return self.age(now) < self.lifetime
+
+    def alpha(self, now):
+        """Return 0-255 alpha (fade out as age increases); integer ms math."""
+        a = 255 - (255 * self.age(now)) // self.lifetime
+        return 0 if a < 0 else (255 if a > 255 else a)
+
+
+class Game:
+    def __init__(self, accelerated=False):
+        pygame.init()
+        pygame.font.init()
+        self.accelerated = accelerated and HAS_SDL2_VIDEO
+        if accelerated and not HAS_SDL2_VIDEO:
+            print("pygame._sdl2 not available, falling back to software rendering")
+        if self.accelerated:
+            self.window = Window("Escape the Qubits", size=(SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.renderer = Renderer(self.window)
+            self.screen = None
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Escape the Qubits")
+        self.clock = pygame.time.Clock()
+        self.font = pygame.font.SysFont(None, 28)
+        self.big_font = pygame.font.SysFont(None, 54)
+
+        # grid positions: player starts bottom-left
+        self.start = (0, GRID_ROWS - 1)
+        self.goal = (GRID_COLS - 1, 0)
+        self.bg_surface = self.build_background()
+        self.qubit_surfaces = self.build_qubit_surfaces()
+
+        # static text never changes, so render it once
+        ins = "Use arrow keys to move. Avoid qubits! Reach the golden tile. R = restart."
+        self.ins_surf = self._text_surface(self.font, ins, (30, 30, 30))
+        self.end_surfs = {}
+        for win, (text, sub, color) in {
+            True: ("You Win! 🎉", "Press R to play again", (40, 160, 40)),
+            False: ("Game Over 💥", "Press R to try again", (200, 40, 40)),
+        }.items():
+            self.end_surfs[win] = (self._text_surface(self.big_font, text, color),
+                                   self._text_surface(self.font, sub, (60, 60, 60)))
+
+        if HAS_NUMPY:
+            # rolling pools of random spawn cells / intervals, generated in
+            # bulk instead of one random call at a time
+            self._rng = np.random.default_rng()
+            self._cells = self._rng.integers(0, GRID_COLS * GRID_ROWS, size=1024)
+            self._cell_idx = 0
+            self._intervals = self._rng.integers(SPAWN_INTERVAL_MIN_MS, SPAWN_INTERVAL_MAX_MS + 1, 1024)
+            self._interval_idx = 0
+
+        if HAS_NUMBA:
+            # scratch buffers for the compiled fade kernel
+            self._spawn_buf = np.empty(MAX_ACTIVE_QUBITS, dtype=np.int64)
+            self._alpha_buf = np.empty(MAX_ACTIVE_QUBITS, dtype=np.int64)
+
+        # fixed pool of Qubit objects, recycled instead of reallocated;
+        # self.n_qubits counts how many slots are live
+        self.qubits = [Qubit((0, 0), -QUBIT_LIFETIME_MS) for _ in range(MAX_ACTIVE_QUBITS)]
+
+        if self.accelerated:
+            self.build_textures()
+        self.reset()
+
+    def _text_surface(self, font, text, color):
+        """font.render, converted to the display format when one exists."""
+        surf = font.render(text, True, color)
+        if self.screen is not None:
+            surf = surf.convert_alpha()
+        return surf
+
+    def build_background(self):
+        """Pre-render the checkerboard (plus goal tile) once; drawing it later
+        is a single blit instead of hundreds of rect/HSV calls per frame."""
+        bg = pygame.Surface((SCREEN_WIDTH, GRID_ROWS * TILE_SIZE))
+        if self.screen is not None:
+            # match the display format so blitting is a plain memcpy
+            bg = bg.convert()
+        for c in range(GRID_COLS):
+            for r in range(GRID_ROWS):
+                x = c * TILE_SIZE
+                y = r * TILE_SIZE
+                rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
+                pygame.draw.rect(bg, TILE_COLORS[(c, r)], rect)
+                # subtle grid line
+                pygame.draw.rect(bg, (200, 200, 200), rect, 1)
+
+        # goal tile highlight
+        gx, gy = self.grid_to_pixel(self.goal)
+        goal_rect = pygame.Rect(gx, gy, TILE_SIZE, TILE_SIZE)
+        pygame.draw.rect(bg, DEST_COLOR, goal_rect)
+        pygame.draw.rect(bg, (120, 120, 0), goal_rect, 3)
+        # small star in center
+        cx = gx + TILE_SIZE // 2
+        cy = gy + TILE_SIZE // 2
+        pygame.draw.circle(bg, (255, 255, 255), (cx, cy), 8)
+        return bg
+
+    def build_qubit_surfaces(self):
+        """Pre-render one qubit sprite (glow + core) per grid tile.
+        At draw time we only modulate the cached sprite's alpha, instead of
+        allocating a fresh SRCALPHA surface and drawing circles every frame."""
+        radius = int(TILE_SIZE * 0.36)
+        surfaces = {}
+        for c in range(GRID_COLS):
+            for r in range(GRID_ROWS):
+                # color based on grid pos to vary look
+                color_rgb = QUBIT_COLORS[(c, r)]
+                surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+                # outer glow
+                pygame.draw.circle(surf, (color_rgb[0], color_rgb[1], color_rgb[2], 120), (radius, radius), radius)
+                # inner core
+                pygame.draw.circle(surf, (255, 255, 255, 255), (radius, radius), int(radius * 0.55))
+                if self.screen is not None:
+                    # display format + per-pixel alpha, so blits skip conversion
+                    surf = surf.convert_alpha()
+                surfaces[(c, r)] = surf
+        return surfaces
+
+    def build_player_surface(self):
+        """Render the player sprite (body, eyes, ring) onto one SRCALPHA surface."""
+        radius = int(TILE_SIZE * 0.36)
+        surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(surf, PLAYER_COLOR, (radius, radius), radius)
+        eye_offset = radius // 3
+        pygame.draw.circle(surf, (60, 60, 60), (radius - eye_offset, radius - 6), 5)
+        pygame.draw.circle(surf, (60, 60, 60), (radius + eye_offset, radius - 6), 5)
+        pygame.draw.circle(surf, (200, 200, 255), (radius, radius), radius, 3)
+        return surf
+
+    def build_textures(self):
+        """Upload the pre-rendered surfaces to the GPU once (accelerated mode)."""
+        self.bg_texture = Texture.from_surface(self.renderer, self.bg_surface)
+        self.qubit_textures = {pos: Texture.from_surface(self.renderer, surf)
+                               for pos, surf in self.qubit_surfaces.items()}
+        self.player_texture = Texture.from_surface(self.renderer, self.build_player_surface())
+        self.ins_texture = Texture.from_surface(self.renderer, self.ins_surf)
+        self.end_textures = {win: (Texture.from_surface(self.renderer, txt),
+                                   Texture.from_surface(self.renderer, sub))
+                             for win, (txt, sub) in self.end_surfs.items()}
+        # timer text texture, rebuilt only when the displayed second changes
+        self.timer_texture = None
+        self.timer_texture_sec = -1
+
+    def reset(self):
+        self.player_c, self.player_r = self.start
+        self.n_qubits = 0                # live slots in the qubit pool
+        self.occ_mask = 0                # bit r*GRID_COLS+c set while a qubit occupies (c, r)
+        self.start_time = pygame.time.get_ticks()
+        self.next_spawn_time = self.start_time + self.next_spawn_interval()
+        self.running = True
+        self.win = False
+        self.lose = False
+        self.pause = False
+        self.end_time = None             # set once when the game ends
+        # cached timer text, re-rendered only when the displayed second changes
+        self._last_sec = -1
+        self._time_surf = None
+        # dirty-tile bookkeeping: repaint everything once, then touch only
+        # tiles whose contents actually changed
+        self._full_redraw = True
+        self._qubit_drawn = {}           # grid_pos -> (alpha bucket, rect) on screen
+        self._player_drawn = None        # ((col, row), rect) on screen
+        self._hud_drawn = None           # (sec, bar fill px) on screen
+        self._end_rects = None           # end-screen text rects, once drawn
+
+    def next_spawn_cell(self, _GC=GRID_COLS, _GR=GRID_ROWS):
+        """Next random (col, row) candidate, pulled from the numpy pool."""
+        if not HAS_NUMPY:
+            return random.randrange(_GC), random.randrange(_GR)
+        if self._cell_idx >= len(self._cells):
+            self._cells = self._rng.integers(0, _GC * _GR, size=1024)
+            self._cell_idx = 0
+        n = int(self._cells[self._cell_idx])
+        self._cell_idx += 1
+        return divmod(n, _GR)
+
+    def next_spawn_interval(self, _SMIN=SPAWN_INTERVAL_MIN_MS, _SMAX=SPAWN_INTERVAL_MAX_MS):
+        """Next random delay (ms) before the following spawn, from the numpy pool."""
+        if not HAS_NUMPY:
+            return random.randint(_SMIN, _SMAX)
+        if self._interval_idx >= len(self._intervals):
+            self._intervals = self._rng.integers(_SMIN, _SMAX + 1, 1024)
+            self._interval_idx = 0
+        v = int(self._intervals[self._interval_idx])
+        self._interval_idx += 1
+        return v
+
+    def spawn_qubit(self, now, _MAQ=MAX_ACTIVE_QUBITS):
+        """Spawn a qubit on a random tile (can pop on player's tile -> instant lose).
+           We never spawn on the goal tile to avoid unfair blocking."""
+        if self.n_qubits >= _MAQ:
+            return
+        tries = 0
+        while tries < 50:
+            c, r = self.next_spawn_cell()
+            if (c, r) == self.goal:
+                tries += 1
+                continue
+            # allow spawn on player tile to make it challenging
+            # ensure no active qubit already at that tile (one mask test)
+            bit = 1 << (r * GRID_COLS + c)
+            if self.occ_mask & bit:
+                tries += 1
+                continue
+            # recycle the next pooled Qubit instead of allocating one
+            qubit = self.qubits[self.n_qubits]
+            qubit.grid_pos = (c, r)
+            qubit.spawn_time = now
+            self.n_qubits += 1
+            self.occ_mask |= bit
+            return
+
+    def grid_to_pixel(self, grid_pos):
+        col, row = grid_pos
+        x = col * TILE_SIZE
+        y = row * TILE_SIZE
+        return x, y
+
+    def handle_input(self, now):
+        for event in pygame.event.get():
+            self.handle_event(event, now)
+
+    def handle_event(self, event, now):
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit(0)
+
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE or event.key == pygame.K_q:
+                pygame.quit()
+                sys.exit(0)
+
+            if self.win or self.lose:
+                if event.key == pygame.K_r:
+                    self.reset()
+                return
+
+            # Movement keys
+            if event.key == pygame.K_LEFT:
+                self.try_move(-1, 0, now)
+            elif event.key == pygame.K_RIGHT:
+                self.try_move(1, 0, now)
+            elif event.key == pygame.K_UP:
+                self.try_move(0, -1, now)
+            elif event.key == pygame.K_DOWN:
+                self.try_move(0, 1, now)
+
+    def try_move(self, dx, dy, now, _GC=GRID_COLS, _GR=GRID_ROWS):
+        if not (self.running and not self.pause):
+            return
+        new_c = self.player_c + dx
+        new_r = self.player_r + dy
+        if 0 <= new_c < _GC and 0 <= new_r < _GR:
+            self.player_c, self.player_r = new_c, new_r
+            # collision test is a shift-and-mask; only on a hit do we scan
+            # the (tiny) pool, since the bit may belong to a qubit that
+            # expired after the last update pass
+            if (self.occ_mask >> (new_r * _GC + new_c)) & 1:
+                for i in range(self.n_qubits):
+                    q = self.qubits[i]
+                    if q.grid_pos == (new_c, new_r) and q.is_alive(now):
+                        self.lose = True
+                        self.running = False
+                        return
+            # check if reached goal
+            if new_c == self.goal[0] and new_r == self.goal[1]:
+                self.win = True
+                self.running = False
+                return
+
+    def update(self, now, _TT=TOTAL_TIME_MS):
+        # Spawn qubit if time
+        if now >= self.next_spawn_time and self.running:
+            self.spawn_qubit(now)
+            self.next_spawn_time = now + self.next_spawn_interval()
+
+        # Compact dead qubits out of the pool in place (dead objects are
+        # swapped past the live count and reused by spawn_qubit)
+        qubits = self.qubits
+        w = 0
+        for i in range(self.n_qubits):
+            q = qubits[i]
+            if q.is_alive(now):
+                if w != i:
+                    qubits[w], qubits[i] = q, qubits[w]
+                w += 1
+            else:
+                gc, gr = q.grid_pos
+                self.occ_mask &= ~(1 << (gr * GRID_COLS + gc))
+        self.n_qubits = w
+
+        # If a qubit popped exactly on player's tile (spawned this frame),
+        # detect it; every bit is live right after the purge above
+        if self.running and (self.occ_mask >> (self.player_r * GRID_COLS + self.player_c)) & 1:
+            # immediate lose
+            self.lose = True
+            self.running = False
+            return
+
+        # Timer check
+        elapsed = now - self.start_time
+        time_left = _TT - elapsed
+        if time_left <= 0 and self.running:
+            self.lose = True
+            self.running = False
+
+    def draw_grid(self):
+        self.screen.blit(self.bg_surface, (0, 0))
+
+    def qubit_alphas(self, now):
+        """Fade alpha for every qubit in self.qubits, 0 once expired.
+        Runs as one compiled kernel call when numba is available."""
+        n = self.n_qubits
+        if HAS_NUMBA:
+            for i in range(n):
+                self._spawn_buf[i] = self.qubits[i].spawn_time
+            _alpha_kernel(self._spawn_buf[:n], now, QUBIT_LIFETIME_MS, self._alpha_buf[:n])
+            return self._alpha_buf
+        if HAS_QUBIT_CORE:
+            return _qubit_core.compute_alphas(self.qubits, n, now, QUBIT_LIFETIME_MS)
+        return [q.alpha(now) if q.is_alive(now) else 0 for q in self.qubits[:n]]
+
+    def draw_qubits(self, now, _TS=TILE_SIZE):
+        """Redraw only the qubit tiles that changed: a sprite is repainted
+        when it appears, vanishes, or crosses a 16-step alpha bucket.
+        Returns the dirty rects."""
+        radius = int(_TS * 0.36)
+        offset = _TS // 2 - radius
+        alphas = self.qubit_alphas(now)
+        live = {}
+        for i in range(self.n_qubits):
+            alpha = alphas[i]
+            if alpha > 0:
+                live[self.qubits[i].grid_pos] = alpha & 0xF0
+        dirty = []
+        drawn = self._qubit_drawn
+        # erase sprites that vanished or changed bucket
+        for pos in list(drawn):
+            bucket, rect = drawn[pos]
+            if live.get(pos) != bucket:
+                self.screen.blit(self.bg_surface, rect, rect)
+                dirty.append(rect)
+                del drawn[pos]
+        # draw new / changed sprites in one batched call
+        blit_seq = []
+        pending = []
+        for pos, bucket in live.items():
+            if pos in drawn:
+                continue
+            surf = self.qubit_surfaces[pos]
+            surf.set_alpha(bucket)
+            x, y = self.grid_to_pixel(pos)
+            blit_seq.append((surf, (x + offset, y + offset)))
+            pending.append((pos, bucket))
+        if blit_seq:
+            for (pos, bucket), rect in zip(pending, self.screen.blits(blit_seq)):
+                drawn[pos] = (bucket, rect)
+                dirty.append(rect)
+        return dirty
+
+    def draw_player(self, repainted=()):
+        """Redraw the player when it moved or a repainted rect overlapped it.
+        Returns the dirty rects (empty when nothing changed)."""
+        x, y = self.grid_to_pixel((self.player_c, self.player_r))
+        cx = x + TILE_SIZE // 2
+        cy = y + TILE_SIZE // 2
+        radius = int(TILE_SIZE * 0.36)
+        rect = pygame.Rect(cx - radius, cy - radius, radius * 2, radius * 2)
+        prev = self._player_drawn
+        moved = prev is None or prev[0] != (self.player_c, self.player_r)
+        if not moved and rect.collidelist(list(repainted)) == -1:
+            return []
+        dirty = []
+        if moved and prev is not None:
+            old_rect = prev[1]
+            self.screen.blit(self.bg_surface, old_rect, old_rect)
+            dirty.append(old_rect)
+        # player body
+        pygame.draw.circle(self.screen, PLAYER_COLOR, (cx, cy), radius)
+        # little eyes to look cute
+        eye_offset = radius // 3
+        pygame.draw.circle(self.screen, (60, 60, 60), (cx - eye_offset, cy - 6), 5)
+        pygame.draw.circle(self.screen, (60, 60, 60), (cx + eye_offset, cy - 6), 5)
+        # light ring
+        pygame.draw.circle(self.screen, (200, 200, 255), (cx, cy), radius, 3)
+        self._player_drawn = ((self.player_c, self.player_r), rect)
+        dirty.append(rect)
+        return dirty
+
+    def draw_hud(self, now):
+        """Repaint the HUD strip only when the second or the bar width moved
+        by a pixel. Returns the dirty rects."""
+        elapsed = now - self.start_time
+        time_left = max(0, TOTAL_TIME_MS - elapsed)
+        sec = time_left // 1000
+        bar_x = 170
+        bar_y = SCREEN_HEIGHT - HUD_HEIGHT + 18
+        bar_w = SCREEN_WIDTH - bar_x - 20
+        bar_h = 18
+        frac = max(0.0, min(1.0, time_left / TOTAL_TIME_MS))
+        bar_fill = int(bar_w * frac)
+        if self._hud_drawn == (sec, bar_fill):
+            return []
+        self._hud_drawn = (sec, bar_fill)
+
+        hud_rect = pygame.Rect(0, SCREEN_HEIGHT - HUD_HEIGHT, SCREEN_WIDTH, HUD_HEIGHT)
+        self.screen.fill((10, 10, 20), hud_rect)
+        # Timer text (only changes once a second)
+        if sec != self._last_sec:
+            self._time_surf = self._text_surface(self.font, f"Time left: {sec}s", (20, 20, 20))
+            self._last_sec = sec
+        self.screen.blit(self._time_surf, (10, SCREEN_HEIGHT - HUD_HEIGHT + 12))
+
+        # Timer bar
+        pygame.draw.rect(self.screen, (200, 200, 200), (bar_x, bar_y, bar_w, bar_h))
+        pygame.draw.rect(self.screen, (60, 180, 60), (bar_x, bar_y, bar_fill, bar_h))
+        pygame.draw.rect(self.screen, (0,0,0), (bar_x, bar_y, bar_w, bar_h), 2)
+
+        # Instructions
+        self.screen.blit(self.ins_surf, (10, SCREEN_HEIGHT - HUD_HEIGHT + 40))
+        return [hud_rect]
+
+    def draw_end_screen(self):
+        center_x = SCREEN_WIDTH // 2
+        center_y = SCREEN_HEIGHT // 2 - 30
+        txt_surf, sub_surf = self.end_surfs[self.win]
+
+        rect = txt_surf.get_rect(center=(center_x, center_y))
+        self.screen.blit(txt_surf, rect)
+
+        sub_rect = sub_surf.get_rect(center=(center_x, center_y + 60))
+        self.screen.blit(sub_surf, sub_rect)
+        return [rect, sub_rect]
+
+    def render_accelerated(self, now):
+        """Draw one frame through the SDL2 Renderer; everything is GPU-composited."""
+        renderer = self.renderer
+        renderer.draw_color = (10, 10, 20, 255)
+        renderer.clear()
+        self.bg_texture.draw(dstrect=(0, 0))
+
+        radius = int(TILE_SIZE * 0.36)
+        alphas = self.qubit_alphas(now)
+        for i in range(self.n_qubits):
+            q = self.qubits[i]
+            alpha = alphas[i]
+            if alpha <= 0:
+                continue
+            x, y = self.grid_to_pixel(q.grid_pos)
+            tex = self.qubit_textures[q.grid_pos]
+            tex.alpha = alpha & 0xF0
+            tex.draw(dstrect=(x + TILE_SIZE // 2 - radius, y + TILE_SIZE // 2 - radius))
+
+        px, py = self.grid_to_pixel((self.player_c, self.player_r))
+        self.player_texture.draw(dstrect=(px + TILE_SIZE // 2 - radius, py + TILE_SIZE // 2 - radius))
+
+        # HUD: timer text (re-uploaded only when the second changes), bar, instructions
+        hud_now = now if self.end_time is None else self.end_time
+        elapsed = hud_now - self.start_time
+        time_left = max(0, TOTAL_TIME_MS - elapsed)
+        sec = time_left // 1000
+        if sec != self.timer_texture_sec:
+            surf = self.font.render(f"Time left: {sec}s", True, (20, 20, 20))
+            self.timer_texture = Texture.from_surface(renderer, surf)
+            self.timer_texture_sec = sec
+        self.timer_texture.draw(dstrect=(10, SCREEN_HEIGHT - HUD_HEIGHT + 12))
+
+        bar_x = 170
+        bar_y = SCREEN_HEIGHT - HUD_HEIGHT + 18
+        bar_w = SCREEN_WIDTH - bar_x - 20
+        bar_h = 18
+        frac = max(0.0, min(1.0, time_left / TOTAL_TIME_MS))
+        renderer.draw_color = (200, 200, 200, 255)
+        renderer.fill_rect(pygame.Rect(bar_x, bar_y, bar_w, bar_h))
+        renderer.draw_color = (60, 180, 60, 255)
+        renderer.fill_rect(pygame.Rect(bar_x, bar_y, int(bar_w * frac), bar_h))
+        renderer.draw_color = (0, 0, 0, 255)
+        renderer.draw_rect(pygame.Rect(bar_x, bar_y, bar_w, bar_h))
+
+        self.ins_texture.draw(dstrect=(10, SCREEN_HEIGHT - HUD_HEIGHT + 40))
+
+        if not self.running:
+            center_x = SCREEN_WIDTH // 2
+            center_y = SCREEN_HEIGHT // 2 - 30
+            txt_tex, sub_tex = self.end_textures[self.win]
+            txt_tex.draw(dstrect=(center_x - txt_tex.width // 2, center_y - txt_tex.height // 2))
+            sub_tex.draw(dstrect=(center_x - sub_tex.width // 2, center_y + 60 - sub_tex.height // 2))
+
+        renderer.present()
+
+    def run(self):
+        while True:
+            # once the end screen has settled (all qubits faded out) nothing
+            # changes until a keypress, so sleep in event.wait instead of
+            # redrawing a static scene at 60 FPS
+            if (not self.running and self.end_time is not None
+                    and pygame.time.get_ticks() - self.end_time > QUBIT_LIFETIME_MS):
+                event = pygame.event.wait(200)
+                if event.type != pygame.NOEVENT:
+                    self.handle_event(event, pygame.time.get_ticks())
+                continue
+
+            dt = self.clock.tick(FPS) / 1000.0
+            # one consistent timestamp per frame (pygame already maintains
+            # this integer-ms counter, and no qubit can expire between two
+            # snapshots taken mid-frame)
+            now = pygame.time.get_ticks()
+            self.handle_input(now)
+            if self.running:
+                self.update(now)
+            elif self.end_time is None:
+                # freeze the HUD clock at the moment the game ended
+                self.end_time = now
+
+            if self.accelerated:
+                self.render_accelerated(now)
+                continue
+
+            # Draw. Each helper repaints only the tiles/strips whose contents
+            # changed and reports the dirty rects; at rest nothing is pushed
+            # to the display at all.
+            dirty = []
+            if self._full_redraw:
+                self.screen.fill((10, 10, 20))
+                self.draw_grid()
+                dirty.append(self.screen.get_rect())
+                self._full_redraw = False
+
+            qubit_dirty = self.draw_qubits(now)
+            dirty.extend(qubit_dirty)
+            dirty.extend(self.draw_player(repainted=qubit_dirty))
+
+            if not self.running:
+                # draw the end text once, and again whenever a fading qubit
+                # underneath it forced a repaint of its tiles
+                if (self._end_rects is None
+                        or any(r.collidelist(self._end_rects) != -1 for r in qubit_dirty)):
+                    self._end_rects = self.draw_end_screen()
+                    dirty.extend(self._end_rects)
+
+            dirty.extend(self.draw_hud(now if self.end_time is None else self.end_time))
+
+            if dirty:
+                pygame.display.update(dirty)
+
+
+def main():
+    # keeping the game loop inside a function (not module scope) also lets
+    # JIT interpreters like PyPy trace and compile it effectively
+    game = Game(accelerated="--gpu" in sys.argv)
+    game.run()
+
+
+if __name__ == "__main__":
+    main()
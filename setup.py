@@ -0,0 +1,9 @@
+"""Builds the optional compiled helpers: python setup.py build_ext --inplace"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="escape-qubits",
+    ext_modules=cythonize(["_qubit_core.pyx"], language_level=3),
+)